@@ -19,17 +19,34 @@ This software is provided "AS IS" without warranty. Use at your own risk.
 """
 
 # Standard library imports
+import hashlib
 import json
+import mmap
+import multiprocessing
+import os
 import re
-import copy
-from collections import Counter
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from pathlib import Path
+from functools import partial
 from typing import Dict, List, Optional, Tuple, Any, Pattern
 
 # Third-party imports
 import streamlit as st # type: ignore
 
+# Optional: faster JSON parsing when orjson is installed
+try:
+    import orjson # type: ignore
+except ImportError:
+    orjson = None
+
+# Optional: linear-time regex engine for link/email patterns when google-re2 is installed
+try:
+    import re2 as re_engine # type: ignore
+except ImportError:
+    re_engine = re
+
 # ===== APPLICATION CONFIGURATION =====
 APP_TITLE = "Google Chat Viewer"
 APP_VERSION = "2.0"
@@ -43,11 +60,21 @@ DEFAULT_TARGET_FILENAME = "messages.json"
 # Display configuration
 DEFAULT_MESSAGES_PER_PAGE = 50
 DEFAULT_MAX_PREVIEW_LENGTH = 100
+JSON_PREVIEW_MESSAGES = 5
+JSON_PREVIEW_LINES = 50
+# Messages rendered per step within a page; "Show more" extends the window
+MESSAGE_RENDER_WINDOW = 20
+# Message ordering is cheap per message, so the process pool only pays off on very large chats
+PARALLEL_PARSE_MIN_MESSAGES = 20000
 
 # Anonymization configuration
 DEFAULT_EMAIL_DOMAIN = "example.com"
+# Per message: ~40-70us to anonymize vs ~10-20us to pickle both ways, plus ~50ms
+# forkserver pool start-up (more on the first pool, which starts the server); two
+# workers break even near 2000 messages, so this leaves headroom
+PARALLEL_ANONYMIZATION_MIN_MESSAGES = 5000
 EMAIL_PATTERN = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-EMAIL_REGEX = re.compile(EMAIL_PATTERN)
+EMAIL_REGEX = re_engine.compile(EMAIL_PATTERN)
 
 # Google Drive link patterns
 DRIVE_LINK_PATTERNS = {
@@ -57,6 +84,34 @@ DRIVE_LINK_PATTERNS = {
     'forms': re.compile(r'https://docs\.google\.com/forms/d/([a-zA-Z0-9-_]+)'),
     'drive': re.compile(r'https://drive\.google\.com/(?:file/d/|open\?id=)([a-zA-Z0-9-_]+)')
 }
+
+# Other common link patterns, most specific first (generic HTTP/HTTPS last)
+LINK_PATTERNS = {
+    'github': (r'https://(?:www\.)?github\.com/[^\s]*', '[GITHUB_LINK]'),
+    'slack': (r'https://[a-zA-Z0-9.-]+\.slack\.com/[^\s]*', '[SLACK_LINK]'),
+    'zoom': (r'https://[a-zA-Z0-9.-]*\.zoom\.us/[^\s]*', '[ZOOM_LINK]'),
+    'meet': (r'https://meet\.google\.com/[^\s]*', '[MEET_LINK]'),
+    'https': (r'https://[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}[^\s]*', '[HTTPS_LINK]'),
+    'http': (r'http://[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}[^\s]*', '[HTTP_LINK]'),
+}
+
+# Full anonymization: any http(s) URL becomes a generic placeholder
+FULL_LINK_PATTERN = r'https?://[^\s]+'
+FULL_LINK_REGEX = re_engine.compile(f'(?i:{FULL_LINK_PATTERN})')
+# Links and emails in one scan (URLs are tried first at each position)
+FULL_UNION_REGEX = re_engine.compile(f'(?P<link>(?i:{FULL_LINK_PATTERN}))|(?P<email>{EMAIL_PATTERN})')
+FULL_UNION_TOKENS = {'link': '[LINK]', 'email': '[EMAIL]'}
+
+# Single alternation over all link patterns so domain-aware anonymization is one scan.
+# Google Drive patterns stay case-sensitive; the others match case-insensitively.
+LINK_UNION_REGEX = re_engine.compile('|'.join(
+    [f'(?P<{name}>{pattern.pattern})' for name, pattern in DRIVE_LINK_PATTERNS.items()] +
+    [f'(?P<{name}>(?i:{pattern}))' for name, (pattern, _) in LINK_PATTERNS.items()]
+))
+LINK_UNION_TOKENS = {
+    **{name: f'[{name.upper()}_LINK]' for name in DRIVE_LINK_PATTERNS},
+    **{name: token for name, (_, token) in LINK_PATTERNS.items()}
+}
 # =====================================
 
 
@@ -70,17 +125,19 @@ def get_json_files() -> List[str]:
         List[str]: Sorted list of JSON filenames with messages.json first
     """
     try:
-        current_dir = Path.cwd()
-        json_files = list(current_dir.glob("*.json"))
+        # scandir yields names with cached file types - no Path objects or extra stat calls
+        with os.scandir('.') as entries:
+            json_files = [entry.name for entry in entries if entry.name.endswith('.json') and entry.is_file()]
         
         if not json_files:
             return []
         
         target_filename = st.session_state.get('target_filename', DEFAULT_TARGET_FILENAME)
+        target_lower = target_filename.lower()
         
         # Prioritize messages.json files
-        messages_files = [f.name for f in json_files if f.name.lower() == target_filename.lower()]
-        other_files = sorted([f.name for f in json_files if f.name.lower() != target_filename.lower()])
+        messages_files = [name for name in json_files if name.lower() == target_lower]
+        other_files = sorted((name for name in json_files if name.lower() != target_lower), key=str.lower)
         
         return messages_files + other_files
         
@@ -89,6 +146,118 @@ def get_json_files() -> List[str]:
         return []
 
 
+def read_chat_json(source) -> Any:
+    """
+    Parse Google Chat JSON from a file path or an uploaded file object.
+    
+    With orjson installed, local files are parsed straight from a read-only
+    memory map and uploads from their in-memory buffer; otherwise the standard
+    json module is used.
+    
+    Args:
+        source: Path to JSON file (string) or file object from upload
+        
+    Returns:
+        Any: Parsed JSON data
+    """
+    # The selected upload is kept across reruns, so an earlier read may have left it at EOF
+    if not isinstance(source, str) and hasattr(source, 'seek'):
+        source.seek(0)
+    
+    if orjson is None:
+        if isinstance(source, str):
+            with open(source, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return json.load(source)
+    
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            # Empty files cannot be memory-mapped
+            if os.fstat(f.fileno()).st_size == 0:
+                return orjson.loads(b'')
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                return orjson.loads(view)
+    
+    return orjson.loads(source.getvalue() if hasattr(source, 'getvalue') else source.read())
+
+
+def serialize_chat_json(data: Any) -> bytes:
+    """
+    Serialize chat data to indented UTF-8 JSON bytes, once per export.
+    
+    Uses orjson when available; otherwise the standard json module
+    (same indent and non-ASCII handling).
+    
+    Args:
+        data: Chat data to serialize
+        
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def file_fingerprint(source: Any) -> str:
+    """
+    Identify a chat export for caching without hashing the parsed data.
+    
+    Local files are identified by path, modification time and size; uploaded
+    files by a digest of their bytes.
+    
+    Args:
+        source: Local file path or Streamlit uploaded file object
+        
+    Returns:
+        str: Hex digest identifying the file contents
+    """
+    key = hashlib.blake2b(digest_size=16)
+    if isinstance(source, str):
+        stat = os.stat(source)
+        key.update(f"{os.path.abspath(source)}:{stat.st_mtime_ns}:{stat.st_size}".encode('utf-8'))
+    else:
+        key.update(source.getvalue())
+    return key.hexdigest()
+
+
+def export_cache_key(file_hash: str, name_mappings: Dict[str, str]) -> str:
+    """
+    Build a cache key for a serialized export without hashing the chat data itself.
+    
+    The file is identified by its file_fingerprint(), computed once when the file
+    is selected; the mappings and link settings are folded in because they
+    determine the anonymized output.
+    
+    Args:
+        file_hash: file_fingerprint() of the source file
+        name_mappings: Anonymization mappings applied to the data
+        
+    Returns:
+        str: Hex digest identifying this export
+    """
+    key = hashlib.blake2b(digest_size=16)
+    key.update(file_hash.encode('utf-8'))
+    key.update(repr(sorted(name_mappings.items())).encode('utf-8'))
+    key.update(repr((
+        st.session_state.get('link_anonymization', True),
+        st.session_state.get('link_level', 'domain'),
+        st.session_state.get('case_insensitive_filenames', True)
+    )).encode('utf-8'))
+    return key.hexdigest()
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def cached_serialize_chat_json(cache_key: str, _data: Any) -> bytes:
+    """
+    serialize_chat_json() memoized across reruns by cache_key.
+    
+    The leading underscore keeps Streamlit from hashing the (large) chat data;
+    cache_key from export_cache_key() identifies it instead.
+    """
+    return serialize_chat_json(_data)
+
+
 # ===== ANONYMIZATION CORE LOGIC =====
 
 def create_anonymization_mappings(data: Dict[str, Any], custom_mappings: Optional[Dict[str, str]] = None, 
@@ -136,128 +305,300 @@ def anonymize_all_links(text: str, anonymization_level: str = "domain") -> str:
         return text
     
     if anonymization_level == "full":
-        text = re.sub(r'https?://[^\s]+', '[LINK]', text, flags=re.IGNORECASE)
-        text = EMAIL_REGEX.sub('[EMAIL]', text)
+        # Every email contains '@'; without one, only links need replacing
+        if '@' in text:
+            text = FULL_UNION_REGEX.sub(lambda m: FULL_UNION_TOKENS[m.lastgroup], text)
+        else:
+            text = FULL_LINK_REGEX.sub('[LINK]', text)
     else:
-        # Domain-aware replacements using pre-compiled patterns
-        for service_name, pattern in DRIVE_LINK_PATTERNS.items():
-            if pattern.search(text):
-                text = pattern.sub(f'[{service_name.upper()}_LINK]', text)
-        
-        # Other common services
-        replacements = [
-            (r'https://(?:www\.)?github\.com/[^\s]*', '[GITHUB_LINK]'),
-            (r'https://[a-zA-Z0-9.-]+\.slack\.com/[^\s]*', '[SLACK_LINK]'),
-            (r'https://[a-zA-Z0-9.-]*\.zoom\.us/[^\s]*', '[ZOOM_LINK]'),
-            (r'https://meet\.google\.com/[^\s]*', '[MEET_LINK]'),
-            (r'https://[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}[^\s]*', '[HTTPS_LINK]'),
-            (r'http://[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}[^\s]*', '[HTTP_LINK]'),
-        ]
-        for pattern, replacement in replacements:
-             text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
+        # Domain-aware replacements in a single scan; the matched group picks the token
+        text = LINK_UNION_REGEX.sub(lambda m: LINK_UNION_TOKENS[m.lastgroup], text)
     
     return text
 
 
-def apply_anonymization(data: Dict[str, Any], name_mappings: Dict[str, str]) -> Dict[str, Any]:
+def _shallow_clone_message(message: Any) -> Any:
     """
-    Apply comprehensive anonymization to Google Chat data.
+    Copy a message just deep enough for _anonymize_message to mutate it safely.
+    
+    Only the containers that anonymization rewrites (creator, quoted message and its
+    creator, reactions, attachments) are copied; everything else, including all
+    strings, is shared with the original message.
+    """
+    if not isinstance(message, dict):
+        return message
+    
+    clone = dict(message)
+    if isinstance(clone.get('creator'), dict):
+        clone['creator'] = dict(clone['creator'])
+    
+    quoted = clone.get('quoted_message_metadata')
+    if isinstance(quoted, dict):
+        quoted = dict(quoted)
+        if isinstance(quoted.get('creator'), dict):
+            quoted['creator'] = dict(quoted['creator'])
+        clone['quoted_message_metadata'] = quoted
+    
+    if isinstance(clone.get('reactions'), list):
+        clone['reactions'] = [dict(r) if isinstance(r, dict) else r for r in clone['reactions']]
+    
+    if isinstance(clone.get('attached_files'), list):
+        clone['attached_files'] = [dict(f) if isinstance(f, dict) else f for f in clone['attached_files']]
+    
+    return clone
+
+
+def _prepare_anonymization(name_mappings: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Precompute everything per-message anonymization needs, once per run.
     
-    Args:
-        data: Original parsed JSON chat data
-        name_mappings: Dictionary mapping original terms to replacements
-        
     Returns:
-        Dict[str, Any]: Fully anonymized copy of the original data
+        Dict[str, Any]: Mappings, compiled mapping union, replacement helpers,
+            email-only mappings and link settings
     """
-    from ui import compile_mappings
-    try:
-        anonymized_data = copy.deepcopy(data)
+    from ui import compile_mapping_union, sort_mappings, replace_mappings, replace_mappings_exact, replace_mappings_exact_case
+    return {
+        'name_mappings': name_mappings,
+        # Resolved here so _anonymize_message doesn't run an import statement per message
+        'replace_mappings': replace_mappings,
+        'replace_mappings_exact': replace_mappings_exact,
+        'replace_mappings_exact_case': replace_mappings_exact_case,
+        'mapping_union': compile_mapping_union(name_mappings),
+        'sorted_mappings': sort_mappings(name_mappings),
+        # Reactor lists only ever contain emails, so look them up in the email mappings alone
+        'email_mappings': {k: v for k, v in name_mappings.items() if '@' in k},
+        'link_anonymization': st.session_state.get('link_anonymization', True),
+        'link_level': st.session_state.get('link_level', 'domain'),
+        'case_insensitive_filenames': st.session_state.get('case_insensitive_filenames', True)
+    }
+
+
+def _anonymize_message(message: Dict[str, Any], context: Dict[str, Any]) -> None:
+    """
+    Anonymize a single (already cloned) message in place.
+    
+    Args:
+        message: Message dict, as returned by _shallow_clone_message
+        context: Precomputed settings from _prepare_anonymization
+    """
+    replace_mappings = context['replace_mappings']
+    replace_mappings_exact = context['replace_mappings_exact']
+    replace_mappings_exact_case = context['replace_mappings_exact_case']
+    name_mappings = context['name_mappings']
+    mapping_union = context['mapping_union']
+    email_mappings = context['email_mappings']
+    link_anonymization = context['link_anonymization']
+    link_level = context['link_level']
+    
+    # 1. Anonymize creator names and emails
+    if name_mappings and 'creator' in message:
+        if 'name' in message['creator']:
+            original_name = message['creator']['name']
+            if original_name in name_mappings:
+                message['creator']['name'] = name_mappings[original_name]
         
-        # Pre-compile mappings
-        compiled_mappings = compile_mappings(name_mappings)
+        if 'email' in message['creator']:
+            original_email = message['creator']['email']
+            if original_email in name_mappings:
+                message['creator']['email'] = name_mappings[original_email]
+    
+    # 2. Anonymize quoted messages
+    if 'quoted_message_metadata' in message:
+        quoted_creator = message['quoted_message_metadata'].get('creator', {})
+        if name_mappings and 'name' in quoted_creator:
+            if quoted_creator['name'] in name_mappings:
+                quoted_creator['name'] = name_mappings[quoted_creator['name']]
         
-        link_anonymization = st.session_state.get('link_anonymization', True)
-        link_level = st.session_state.get('link_level', 'domain')
+        if name_mappings and 'email' in quoted_creator:
+            if quoted_creator['email'] in name_mappings:
+                quoted_creator['email'] = name_mappings[quoted_creator['email']]
         
-        # Anonymize messages
-        for message in anonymized_data.get('messages', []):
-            # 1. Anonymize creator names and emails
-            if 'creator' in message:
-                if 'name' in message['creator']:
-                    original_name = message['creator']['name']
-                    if original_name in name_mappings:
-                        message['creator']['name'] = name_mappings[original_name]
-                
-                if 'email' in message['creator']:
-                    original_email = message['creator']['email']
-                    if original_email in name_mappings:
-                        message['creator']['email'] = name_mappings[original_email]
-            
-            # 2. Anonymize quoted messages
-            if 'quoted_message_metadata' in message:
-                quoted_creator = message['quoted_message_metadata'].get('creator', {})
-                if 'name' in quoted_creator:
-                    if quoted_creator['name'] in name_mappings:
-                        quoted_creator['name'] = name_mappings[quoted_creator['name']]
-                
-                if 'email' in quoted_creator:
-                    if quoted_creator['email'] in name_mappings:
-                        quoted_creator['email'] = name_mappings[quoted_creator['email']]
-                
-                if 'text' in message['quoted_message_metadata']:
-                    quoted_text = message['quoted_message_metadata']['text']
-                    for original, replacement, word_pattern, _, _ in compiled_mappings:
-                        if '@' in original:
-                            quoted_text = re.sub(re.escape(original), replacement, quoted_text, flags=re.IGNORECASE)
-                        else:
-                            quoted_text = word_pattern.sub(replacement, quoted_text)
-                    
-                    if link_anonymization:
-                        quoted_text = anonymize_all_links(quoted_text, link_level)
-                    message['quoted_message_metadata']['text'] = quoted_text
-            
-            # 3. Anonymize main message text
-            if 'text' in message and message['text']:
-                text = message['text']
-                
-                for original, replacement, word_pattern, punct_pattern, exact_pattern in compiled_mappings:
-                    if original.lower() in text.lower():
-                        if '@' in original:
-                            text = re.sub(re.escape(original), replacement, text, flags=re.IGNORECASE)
-                        else:
-                            text = word_pattern.sub(replacement, text)
-                            text = punct_pattern.sub(replacement, text)
-                            if len(original.split()) > 1:
-                                text = exact_pattern.sub(replacement, text)
-                
-                if link_anonymization:
-                    text = anonymize_all_links(text, link_level)
-                
-                message['text'] = text
-            
-            # 4. Anonymize reactions (reactor emails)
-            if 'reactions' in message:
-                for reaction in message['reactions']:
-                    if 'reactor_emails' in reaction:
-                        reaction['reactor_emails'] = [
-                            name_mappings.get(email, email) for email in reaction['reactor_emails']
-                        ]
+        if 'text' in message['quoted_message_metadata']:
+            quoted_text = message['quoted_message_metadata']['text']
+            if name_mappings:
+                quoted_text = replace_mappings(quoted_text, mapping_union)
             
-            # 5. Anonymize attachments
-            if 'attached_files' in message:
-                for attachment in message['attached_files']:
-                    if 'original_name' in attachment:
-                        file_name = attachment['original_name']
-                        for original, replacement, _, _, _ in compiled_mappings:
-                            file_name = re.sub(re.escape(original), replacement, file_name, flags=re.IGNORECASE)
-                        attachment['original_name'] = file_name
+            if link_anonymization:
+                quoted_text = anonymize_all_links(quoted_text, link_level)
+            message['quoted_message_metadata']['text'] = quoted_text
+    
+    # 3. Anonymize main message text
+    if 'text' in message and message['text']:
+        text = message['text']
+        
+        # Prefilter candidates, then a single scan instead of one pass per mapping
+        if name_mappings:
+            text = replace_mappings(text, mapping_union)
         
-        return anonymized_data
+        if link_anonymization:
+            text = anonymize_all_links(text, link_level)
         
-    except Exception as e:
-        st.error(f"❌ Error during anonymization: {e}")
-        return data
+        message['text'] = text
+    
+    # 4. Anonymize reactions (reactor emails)
+    if email_mappings and 'reactions' in message:
+        for reaction in message['reactions']:
+            if reaction.get('reactor_emails'):
+                reaction['reactor_emails'] = [
+                    email_mappings.get(email, email) for email in reaction['reactor_emails']
+                ]
+    
+    # 5. Anonymize attachments
+    if name_mappings and 'attached_files' in message:
+        for attachment in message['attached_files']:
+            if 'original_name' in attachment:
+                if context['case_insensitive_filenames']:
+                    attachment['original_name'] = replace_mappings_exact(attachment['original_name'], mapping_union)
+                else:
+                    attachment['original_name'] = replace_mappings_exact_case(attachment['original_name'], context['sorted_mappings'])
+
+
+def _anonymize_chunk(messages: List[Any], context: Dict[str, Any]) -> List[Any]:
+    """
+    Process-pool worker: anonymize a slice of messages.
+    
+    Messages arrive as pickled copies, so they are rewritten in place without cloning.
+    Regex patterns are compiled (and cached) once per worker process.
+    """
+    for message in messages:
+        _anonymize_message(message, context)
+    return messages
+
+
+def process_pool_context() -> multiprocessing.context.BaseContext:
+    """
+    Start method for worker pools. Streamlit serves each session on its own thread,
+    and forking a threaded process can copy a held lock into the child and deadlock
+    it, so workers start from a fresh forkserver (spawn where that is unavailable).
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        # Import the worker modules once in the server rather than in every worker
+        # (only takes effect before the server's first start)
+        context.set_forkserver_preload(['app', 'ui'])
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+def _anonymize_messages(messages: List[Any], context: Dict[str, Any], in_place: bool = False) -> List[Any]:
+    """
+    Return anonymized clones of messages, leaving the originals untouched
+    (or, with in_place, rewriting the original message dicts directly).
+    
+    Large chats are split into one chunk per CPU and anonymized in a process
+    pool (Python regex holds the GIL, so threads would not help). Small chats,
+    single-CPU machines and environments where worker processes cannot be
+    started fall back to the in-process loop.
+    """
+    workers = os.cpu_count() or 1
+    if workers > 1 and len(messages) >= PARALLEL_ANONYMIZATION_MIN_MESSAGES:
+        # Streamlit runs this file as __main__; take the worker from the importable
+        # module so it can be pickled by reference under any start method
+        from app import _anonymize_chunk as worker
+        chunk_size = -(-len(messages) // workers)
+        chunks = [messages[i:i + chunk_size] for i in range(0, len(messages), chunk_size)]
+        try:
+            with ProcessPoolExecutor(max_workers=len(chunks), mp_context=process_pool_context()) as executor:
+                results = executor.map(worker, chunks, [context] * len(chunks))
+                return [message for chunk in results for message in chunk]
+        except (OSError, BrokenProcessPool):
+            pass
+    
+    if in_place:
+        for message in messages:
+            _anonymize_message(message, context)
+        return messages
+    
+    anonymized = []
+    for message in messages:
+        clone = _shallow_clone_message(message)
+        _anonymize_message(clone, context)
+        anonymized.append(clone)
+    return anonymized
+
+
+def parse_and_anonymize(data: Dict[str, Any], name_mappings: Dict[str, str], *, in_place: bool = False) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Extract statistics fields and anonymize every message in a single pass.
+    
+    Statistics fields are read from the original message (so emails stay
+    available for the statistics table) while the anonymized clone is built
+    alongside it.
+    
+    Args:
+        data: Original parsed JSON chat data
+        name_mappings: Dictionary mapping original terms to replacements
+        in_place: Rewrite each message right after its statistics fields are
+            read instead of cloning it. The top-level dict is still copied. On
+            error the exception is raised instead of reported: messages
+            processed so far are already rewritten, so data must be discarded.
+        
+    Returns:
+        Tuple[Dict[str, Any], List[Dict[str, Any]]]: (anonymized_data, parsed_messages)
+    """
+    from ui import extract_stats_fields
+    context = _prepare_anonymization(name_mappings)
+    messages = data.get('messages', [])
+    parsed_messages = []
+    anonymized_messages = []
+    anonymization_error = None
+    
+    if not name_mappings and not context['link_anonymization']:
+        # Nothing to rewrite: statistics only, data returned as-is
+        extract = partial(extract_stats_fields, name_mappings=name_mappings)
+        return data, [parsed for parsed in map(extract, messages) if parsed]
+    
+    if (os.cpu_count() or 1) > 1 and len(messages) >= PARALLEL_ANONYMIZATION_MIN_MESSAGES:
+        # Large chats: anonymize in the process pool, extract statistics here
+        extract = partial(extract_stats_fields, name_mappings=name_mappings)
+        parsed_messages = [parsed for parsed in map(extract, messages) if parsed]
+        try:
+            anonymized_messages = _anonymize_messages(messages, context, in_place)
+        except Exception as e:
+            anonymization_error = e
+    else:
+        for msg in messages:
+            parsed_msg = extract_stats_fields(msg, name_mappings)
+            if parsed_msg:
+                parsed_messages.append(parsed_msg)
+            
+            # On failure keep collecting statistics, but stop anonymizing
+            if anonymization_error is None:
+                try:
+                    clone = msg if in_place else _shallow_clone_message(msg)
+                    _anonymize_message(clone, context)
+                    anonymized_messages.append(clone)
+                except Exception as e:
+                    anonymization_error = e
+    
+    if anonymization_error is not None:
+        if in_place:
+            raise anonymization_error
+        st.error(f"❌ Error during anonymization: {anonymization_error}")
+        return data, parsed_messages
+    
+    anonymized_data = dict(data)
+    anonymized_data['messages'] = anonymized_messages
+    return anonymized_data, parsed_messages
+
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def cached_parse_and_anonymize(cache_key: str, _data: Dict[str, Any],
+                               _name_mappings: Dict[str, str]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    parse_and_anonymize() (in place) memoized across reruns by cache_key.
+    
+    Keeps large chats from starting a process pool and pickling every message on
+    each rerun. cache_key from export_cache_key() covers the file, mappings and
+    link settings, so the underscored arguments are not hashed.
+    
+    Anonymization errors propagate, so a half-rewritten result is never cached;
+    _data must then be discarded.
+    
+    Returns:
+        Tuple[Dict[str, Any], List[Dict[str, Any]]]: (anonymized_data, parsed_messages)
+    """
+    return parse_and_anonymize(_data, _name_mappings, in_place=True)
 
 
 def save_anonymized_data(data, original_filename, save_option):
@@ -273,16 +614,16 @@ def save_anonymized_data(data, original_filename, save_option):
             anonymized_filename = f"{original_filename}_anonymized"
         
         if save_option == "Save to same folder":
-            with open(anonymized_filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with open(anonymized_filename, 'wb') as f:
+                f.write(serialize_chat_json(data))
             st.success(f"✅ Anonymized data saved as: `{anonymized_filename}`")
             
         elif save_option == "Ask me where to save":
-            json_str = json.dumps(data, indent=2, ensure_ascii=False)
+            json_bytes = serialize_chat_json(data)
             st.info("💾 **Click the button below to download and choose where to save:**")
             st.download_button(
                 label="📥 Download Anonymized Data",
-                data=json_str,
+                data=json_bytes,
                 file_name=anonymized_filename,
                 mime="application/json",
                 help="Click to download - your browser will ask where to save the file",
@@ -301,41 +642,62 @@ def create_message_statistics(messages):
         return {}
     
     try:
-        message_counts = Counter(msg['name'] for msg in messages)
-        original_counts = Counter(msg.get('original_name', msg['name']) for msg in messages)
-        
+        # Single pass over the messages: counters, lookups and date range together
+        message_counts = defaultdict(int)
+        original_counts = defaultdict(int)
+        daily_counts = defaultdict(int)
         # Create name to email mapping (using original names)
         name_to_email = {}
         # Create displayed name to original name mapping
         display_to_original = {}
+        start = end = None
         
         for msg in messages:
-            original_name = msg.get('original_name', msg['name'])
             displayed_name = msg['name']
+            original_name = msg.get('original_name', displayed_name)
+            timestamp = msg['timestamp']
             email = msg.get('email')
             
+            message_counts[displayed_name] += 1
+            original_counts[original_name] += 1
+            daily_counts[timestamp.date()] += 1
+            
+            if start is None or timestamp < start:
+                start = timestamp
+            if end is None or timestamp > end:
+                end = timestamp
+            
             if email and original_name not in name_to_email:
                 name_to_email[original_name] = email
             
             if displayed_name != original_name and displayed_name not in display_to_original:
                 display_to_original[displayed_name] = original_name
         
-        timestamps = [msg['timestamp'] for msg in messages]
+        # Callers rely on Counter.most_common()
+        message_counts = Counter(message_counts)
+        original_counts = Counter(original_counts)
+        daily_counts = Counter(daily_counts)
+        
         date_range = {
-            'start': min(timestamps),
-            'end': max(timestamps),
-            'total_days': (max(timestamps) - min(timestamps)).days + 1
+            'start': start,
+            'end': end,
+            'total_days': (end - start).days + 1
         }
         
-        dates = [ts.date() for ts in timestamps]
-        daily_counts = Counter(dates)
         most_active_day = daily_counts.most_common(1)[0] if daily_counts else None
         
+        # Displayed name -> (email, original name), resolved once for the participant table
+        participant_info = {}
+        for displayed_name in message_counts:
+            original_name = display_to_original.get(displayed_name, displayed_name)
+            participant_info[displayed_name] = (name_to_email.get(original_name, 'N/A'), original_name)
+        
         return {
             'message_counts': message_counts,
             'original_counts': original_counts,
             'name_to_email': name_to_email,
             'display_to_original': display_to_original,
+            'participant_info': participant_info,
             'total_messages': len(messages),
             'unique_participants': len(message_counts),
             'date_range': date_range,
@@ -362,7 +724,7 @@ def main() -> None:
         render_application_header, render_usage_instructions,
         select_json_file, load_and_validate_chat_data,
         anonymize_data_interface, display_message_statistics,
-        display_processed_messages, compile_mappings, parse_chat_message
+        display_processed_messages, extract_stats_fields
     )
     
     # Initialize
@@ -387,37 +749,50 @@ def main() -> None:
     should_anonymize, custom_mappings, save_option, anonymization_mode = anonymize_data_interface()
     
     name_mappings = {}
-    compiled_mappings = []
     
     if should_anonymize:
         with st.spinner("🔒 Creating anonymization mappings..."):
             name_mappings = create_anonymization_mappings(data, custom_mappings, anonymization_mode) # pyright: ignore[reportArgumentType]
-            compiled_mappings = compile_mappings(name_mappings)
             
         if name_mappings:
             st.success(f"✅ Created {len(name_mappings)} anonymization mappings")
         else:
             st.info("ℹ️ No anonymization mappings created")
     
-    # Statistics
-    with st.spinner("📊 Generating statistics..."):
-        # Parse messages first for statistics
-        parsed_messages = []
-        for msg in data['messages']:
-            parsed_msg = parse_chat_message(msg, name_mappings, compiled_mappings)
-            if parsed_msg:
-                parsed_messages.append(parsed_msg)
-        
-        stats = create_message_statistics(parsed_messages)
+    # Statistics (and anonymization, fused into the same pass over the messages)
+    display_data = data
+    anonymized = False
+    file_hash = st.session_state.get('file_hash') or file_fingerprint(selected_file)
+    if should_anonymize and name_mappings:
+        with st.spinner("🔄 Applying anonymization and generating statistics..."):
+            # data is reloaded on every run and superseded by display_data, so it is
+            # rewritten in place; the result is cached per file, mappings and link settings
+            try:
+                display_data, parsed_messages = cached_parse_and_anonymize(
+                    export_cache_key(file_hash, name_mappings), data, name_mappings
+                )
+                anonymized = True
+            except Exception as e:
+                st.error(f"❌ Error during anonymization: {e}")
+                # The in-place pass left data partly rewritten; show the original instead
+                data = display_data = read_chat_json(selected_file)
+                extract = partial(extract_stats_fields, name_mappings=name_mappings)
+                parsed_messages = [parsed for parsed in map(extract, data['messages']) if parsed]
+            stats = create_message_statistics(parsed_messages)
+    else:
+        with st.spinner("📊 Generating statistics..."):
+            # Statistics only need sender, email and timestamp - skip text rendering
+            extract = partial(extract_stats_fields, name_mappings=name_mappings)
+            parsed_messages = [parsed for parsed in map(extract, data['messages']) if parsed]
+            
+            stats = create_message_statistics(parsed_messages)
     
     display_message_statistics(stats)
     
-    # Apply anonymization to data
-    display_data = data
-    if should_anonymize:
+    if should_anonymize and name_mappings and not anonymized:
+        st.warning("⚠️ Anonymization failed, so no anonymized file is offered for download or saved.")
+    elif should_anonymize:
         if name_mappings:
-            with st.spinner("🔄 Applying anonymization..."):
-                display_data = apply_anonymization(data, name_mappings)
             st.success("✅ Anonymization applied successfully!")
         else:
             st.info("ℹ️ No anonymization mappings were created. The downloaded file will match the original data.")
@@ -429,11 +804,11 @@ def main() -> None:
         else:
             anonymized_filename = f"{display_name}_anonymized"
         
-        # Show download button for current display data
-        json_str = json.dumps(display_data, indent=2, ensure_ascii=False)
+        # Serialize once (cached across reruns); the same bytes back the download, preview and optional save
+        json_bytes = cached_serialize_chat_json(export_cache_key(file_hash, name_mappings), display_data)
         st.download_button(
             label="📥 Download Anonymized Data",
-            data=json_str,
+            data=json_bytes,
             file_name=anonymized_filename,
             mime="application/json",
             help="Download the processed chat data as JSON",
@@ -443,19 +818,25 @@ def main() -> None:
 
         # Preview anonymized data
         with st.expander("📄 Preview Anonymized Data", expanded=False):
-            preview_lines = json_str.splitlines()
-            preview_snippet = "\n".join(preview_lines[:50]) if preview_lines else ""
+            # Serialize only the first few messages for the snippet, not the whole export
+            messages = display_data.get('messages', [])
+            preview_obj = {
+                k: (messages[:JSON_PREVIEW_MESSAGES] if k == 'messages' else v)
+                for k, v in display_data.items()
+            }
+            preview_lines = serialize_chat_json(preview_obj).decode('utf-8').splitlines()
+            preview_snippet = "\n".join(preview_lines[:JSON_PREVIEW_LINES]) if preview_lines else ""
             st.code(preview_snippet or "(empty)", language="json")
             
-            if len(preview_lines) > 50:
+            if len(messages) > JSON_PREVIEW_MESSAGES or len(preview_lines) > JSON_PREVIEW_LINES:
                 if st.checkbox("Show full JSON content", key="show_full_json"):
-                    st.code(json_str, language="json")
+                    st.code(json_bytes.decode('utf-8'), language="json")
         
         # Optional: Also save to same folder if requested (only when data changed)
-        if save_option == "Save to same folder" and name_mappings:
+        if save_option == "Save to same folder" and anonymized:
             try:
-                with open(anonymized_filename, 'w', encoding='utf-8') as f:
-                    json.dump(display_data, f, indent=2, ensure_ascii=False)
+                with open(anonymized_filename, 'wb') as f:
+                    f.write(json_bytes)
                 st.info(f"💾 Also saved to same folder as: `{anonymized_filename}`")
             except Exception as e:
                 st.warning(f"⚠️ Could not save to folder: {e}")
@@ -9,53 +9,228 @@ Version: 2.0
 License: MIT
 """
 
+import hashlib
 import json
+import logging
+import os
 import re
+import uuid
+from array import array
+from functools import lru_cache, partial
+from types import SimpleNamespace
 from pathlib import Path
-from typing import Dict, Optional, Tuple, Any, List, Pattern
+from typing import TYPE_CHECKING, Dict, FrozenSet, Optional, Tuple, Any, List, Pattern
 from datetime import datetime
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 import streamlit as st # type: ignore
 
+if TYPE_CHECKING:
+    import pandas as pd # type: ignore
+
+logger = logging.getLogger(__name__)
+
 # Import configuration constants from app
 from app import (
     APP_TITLE, APP_VERSION, APP_AUTHOR,
     DEFAULT_MAX_FILE_SIZE_MB, DEFAULT_SUPPORTED_FILE_TYPES,
     DEFAULT_TARGET_FILENAME, DEFAULT_MESSAGES_PER_PAGE,
-    DEFAULT_MAX_PREVIEW_LENGTH, DEFAULT_EMAIL_DOMAIN
+    DEFAULT_MAX_PREVIEW_LENGTH, DEFAULT_EMAIL_DOMAIN, MESSAGE_RENDER_WINDOW,
+    PARALLEL_PARSE_MIN_MESSAGES,
+    read_chat_json, get_json_files, file_fingerprint, process_pool_context, re_engine
 )
 
+# Fragments rerun only the decorated function on widget changes (Streamlit >= 1.37,
+# experimental before that); on older versions the function simply runs inline
+_st_fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None)
+fragment = _st_fragment or (lambda func: func)
+
 
 # ===== HELPER FUNCTIONS =====
 
-def compile_mappings(name_mappings: Dict[str, str]) -> List[Tuple[str, str, Pattern, Pattern, Pattern]]:
+# Dotted extensions for upload validation (rebuilt only when supported_file_types changes)
+DEFAULT_SUPPORTED_EXTENSIONS = frozenset(f".{ext}" for ext in DEFAULT_SUPPORTED_FILE_TYPES)
+
+WORD_TOKEN_REGEX = re.compile(r'\w+')
+
+# Fixed Google Chat date format: "Monday, January 2, 2024 3:04:05 PM UTC"
+CHAT_DATE_FORMAT = "%A, %B %d, %Y %I:%M:%S %p %Z"
+MONTH_NUMBERS = {
+    'January': 1, 'February': 2, 'March': 3, 'April': 4, 'May': 5, 'June': 6,
+    'July': 7, 'August': 8, 'September': 9, 'October': 10, 'November': 11, 'December': 12
+}
+WEEKDAY_NAMES = frozenset(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'])
+
+
+def _is_ascii_digits(field: str, min_len: int, max_len: int) -> bool:
+    """True if field is min_len..max_len ASCII digits."""
+    return min_len <= len(field) <= max_len and field.isascii() and field.isdigit()
+
+
+def parse_chat_date(date_str: str) -> datetime:
     """
-    Pre-compile regex patterns for all mappings to improve performance.
-    Returns a list of tuples: (original, replacement, word_pattern, punct_pattern, exact_pattern)
+    Parse a Google Chat date string without going through strptime.
+    
+    Splits the fixed format on whitespace and converts the digits directly;
+    anything unexpected falls back to strptime with CHAT_DATE_FORMAT.
+    Raises ValueError if the string cannot be parsed.
+    """
+    try:
+        weekday, month, day, year, clock, meridiem, zone = date_str.split()
+        if weekday[:-1] not in WEEKDAY_NAMES or not weekday.endswith(',') or not day.endswith(','):
+            raise ValueError(date_str)
+        if zone not in ('UTC', 'GMT') or meridiem not in ('AM', 'PM'):
+            raise ValueError(date_str)
+        day = day[:-1]
+        clock_parts = clock.split(':')
+        # Plain ASCII digits of the widths strptime accepts; int() alone would
+        # also take "+2", "1_0" or a 2-digit year
+        if len(clock_parts) != 3 or not _is_ascii_digits(year, 4, 4) or not all(
+            _is_ascii_digits(part, 1, 2) for part in (day, *clock_parts)
+        ):
+            raise ValueError(date_str)
+        hour, minute, second = (int(part) for part in clock_parts)
+        if not 1 <= hour <= 12:
+            raise ValueError(date_str)
+        hour = hour % 12 + (12 if meridiem == 'PM' else 0)
+        return datetime(int(year), MONTH_NUMBERS[month], int(day), hour, minute, second)
+    except (KeyError, ValueError):
+        return datetime.strptime(date_str, CHAT_DATE_FORMAT)
+
+
+def sort_mappings(name_mappings: Dict[str, str]) -> List[Tuple[str, str]]:
+    """
+    Sort mappings by length of the original (longest first) to prevent partial replacements.
+    Compute once per run and pass the result along instead of re-sorting per message.
     """
     if not name_mappings:
         return []
-        
-    # Sort by length (longest first) to prevent partial replacements
-    sorted_mappings = sorted(name_mappings.items(), key=lambda x: len(x[0]), reverse=True)
-    
-    compiled = []
-    for original, replacement in sorted_mappings:
-        # 1. Word boundaries
-        word_pattern = re.compile(r'\b' + re.escape(original) + r'\b', flags=re.IGNORECASE)
-        # 2. Punctuation-aware
-        punct_pattern = re.compile(r'(?<=["\'\s])' + re.escape(original) + r'(?=["\'\s\.,!?])', flags=re.IGNORECASE)
-        # 3. Exact match (for multi-word)
-        exact_pattern = re.compile(re.escape(original), flags=re.IGNORECASE)
-        
-        compiled.append((original, replacement, word_pattern, punct_pattern, exact_pattern))
-        
-    return compiled
+    return sorted(name_mappings.items(), key=lambda x: len(x[0]), reverse=True)
+
+
+def compile_mapping_union(name_mappings: Dict[str, str]) -> Tuple[FrozenSet[str], Tuple[str, ...], Dict[str, str]]:
+    """
+    Prepare mappings for single-scan replacement with a cheap candidate prefilter.
+    Returns a tuple: (word_keys, phrase_keys, lookup)
+    - word_keys: lowercased originals made only of word characters (matched via token set)
+    - phrase_keys: other lowercased originals - emails, multi-word, punctuation (matched via substring)
+    - lookup: lowercased original -> replacement
+    """
+    word_keys = set()
+    phrase_keys = []
+    lookup = {}
+    for original, replacement in sort_mappings(name_mappings):
+        key = original.lower()
+        if key in lookup:
+            continue
+        lookup[key] = replacement
+        if WORD_TOKEN_REGEX.fullmatch(key):
+            word_keys.add(key)
+        else:
+            phrase_keys.append(key)
+    
+    return frozenset(word_keys), tuple(phrase_keys), lookup
 
 
-def parse_chat_message(message, name_mappings=None, compiled_mappings=None):
-    """Parse a single message from JSON and extract key data."""
+@lru_cache(maxsize=256)
+def _compile_union_pattern(keys: Tuple[str, ...]) -> Pattern:
+    """Compile a case-insensitive alternation over the given keys (already sorted longest first)."""
+    alternatives = []
+    for key in keys:
+        escaped = re.escape(key)
+        if '@' in key or len(key.split()) > 1:
+            # Emails and multi-word names match exactly
+            alternatives.append(escaped)
+        else:
+            # Word boundaries, or punctuation-aware boundaries
+            alternatives.append(r'\b' + escaped + r'\b|(?<=["\'\s])' + escaped + r'(?=["\'\s\.,!?])')
+    return re.compile('|'.join(f'(?:{alt})' for alt in alternatives), flags=re.IGNORECASE)
+
+
+def replace_mappings(text: str, mapping_union: Tuple[FrozenSet[str], Tuple[str, ...], Dict[str, str]]) -> str:
+    """
+    Replace every mapped term in text with a single scan.
+    
+    A token-set intersection and substring checks first select the mappings that can
+    occur in this text; most messages have none and return without any regex scan.
+    The union pattern is then built over the candidates only (cached per candidate set).
+    """
+    word_keys, phrase_keys, lookup = mapping_union
+    if not text or not lookup:
+        return text
+    
+    text_lower = text.lower()
+    candidates = set()
+    if word_keys:
+        candidates.update(word_keys.intersection(WORD_TOKEN_REGEX.findall(text_lower)))
+    candidates.update(key for key in phrase_keys if key in text_lower)
+    if not candidates:
+        return text
+    
+    union_pattern = _compile_union_pattern(tuple(sorted(candidates, key=len, reverse=True)))
+    return union_pattern.sub(lambda m: lookup.get(m.group(0).lower(), m.group(0)), text)
+
+
+@lru_cache(maxsize=256)
+def _compile_exact_pattern(keys: Tuple[str, ...], ignore_case: bool = True) -> Pattern:
+    """
+    Compile an alternation of literal keys (already sorted longest first).
+    Case-insensitive by default; pass ignore_case=False for an exact-case match.
+    
+    Plain literals are RE2-compatible, so this uses the linear-time engine when
+    google-re2 is installed and falls back to re if RE2 rejects the pattern.
+    """
+    alternation = '|'.join(re_engine.escape(key) for key in keys)
+    pattern = '(?i:' + alternation + ')' if ignore_case else alternation
+    try:
+        return re_engine.compile(pattern)
+    except re_engine.error:
+        return re.compile('|'.join(re.escape(key) for key in keys), flags=re.IGNORECASE if ignore_case else 0)
+
+
+def replace_mappings_exact(text: str, mapping_union: Tuple[FrozenSet[str], Tuple[str, ...], Dict[str, str]]) -> str:
+    """
+    Replace mapped terms anywhere in text (no word boundaries), e.g. inside file names.
+    Only mappings whose original occurs in the text take part in the single scan.
+    """
+    _, _, lookup = mapping_union
+    if not text or not lookup:
+        return text
+    
+    text_lower = text.lower()
+    # lookup preserves the longest-first order of sort_mappings()
+    candidates = tuple(key for key in lookup if key in text_lower)
+    if not candidates:
+        return text
+    
+    return _compile_exact_pattern(candidates).sub(lambda m: lookup.get(m.group(0).lower(), m.group(0)), text)
+
+
+def replace_mappings_exact_case(text: str, sorted_mappings: List[Tuple[str, str]]) -> str:
+    """
+    Case-sensitive variant of replace_mappings_exact.
+    A single scan, so a replacement is never matched again by a later mapping.
+    """
+    if not text or not sorted_mappings:
+        return text
+    
+    candidates = tuple(original for original, _ in sorted_mappings if original and original in text)
+    if not candidates:
+        return text
+    
+    lookup = dict(sorted_mappings)
+    return _compile_exact_pattern(candidates, ignore_case=False).sub(lambda m: lookup[m.group(0)], text)
+
+
+def extract_stats_fields(message, name_mappings=None):
+    """
+    Extract the cheap per-message fields needed for statistics and ordering.
+    
+    No text anonymization or markdown is built here; use render_message()
+    for the messages that are actually displayed.
+    """
     try:
         if not isinstance(message, dict):
             return None
@@ -77,39 +252,49 @@ def parse_chat_message(message, name_mappings=None, compiled_mappings=None):
             date_str = message['created_date']
             if " at " in date_str:
                 date_str = date_str.replace(" at ", " ").replace("\u202f", " ")
-            timestamp = datetime.strptime(date_str, "%A, %B %d, %Y %I:%M:%S %p %Z")
+            timestamp = parse_chat_date(date_str)
         except (KeyError, ValueError) as e:
             timestamp = datetime.now()
         
+        return {
+            'name': sender_name,
+            'timestamp': timestamp,
+            'original_name': original_name,
+            'email': creator_email
+        }
+
+    except Exception as e:
+        print(f"Error parsing message: {e}")
+        return None
+
+
+def render_message(message, name_mappings=None, mapping_union=None) -> str:
+    """
+    Build the display markdown for a single message (quote, text, attachments, reactions).
+    
+    mapping_union is the output of compile_mapping_union(), computed once by the
+    caller; text and quoted text are anonymized with one replace_mappings() scan.
+    """
+    try:
         text = message.get('text', '')
         if not isinstance(text, str):
             text = str(text) if text is not None else ''
         
         # Apply anonymization to text
-        if compiled_mappings and text:
-            for original, replacement, word_pattern, _, _ in compiled_mappings:
-                if original.lower() in text.lower():
-                    if '@' in original:
-                        text = re.sub(re.escape(original), replacement, text, flags=re.IGNORECASE)
-                    else:
-                        text = word_pattern.sub(replacement, text)
-        elif name_mappings and text:
-            # Fallback for backward compatibility
-            sorted_mappings = sorted(name_mappings.items(), key=lambda x: len(x[0]), reverse=True)
-            for original, replacement in sorted_mappings:
-                if original.lower() in text.lower():
-                    word_pattern = r'\b' + re.escape(original) + r'\b'
-                    text = re.sub(word_pattern, replacement, text, flags=re.IGNORECASE)
+        if mapping_union is not None:
+            text = replace_mappings(text, mapping_union)
 
         # Process attachments
         attachment_md = ""
         try:
             if 'attached_files' in message and isinstance(message['attached_files'], list):
+                attachment_parts = []
                 for f in message['attached_files']:
                     if isinstance(f, dict):
                         name = f.get('original_name', 'Attached File')
                         name = str(name)[:100]
-                        attachment_md += f"\n\n> 📎 **Attachment:** `{name}`"
+                        attachment_parts.append(f"\n\n> 📎 **Attachment:** `{name}`")
+                attachment_md = "".join(attachment_parts)
         except Exception:
             pass
         
@@ -144,19 +329,8 @@ def parse_chat_message(message, name_mappings=None, compiled_mappings=None):
                     if isinstance(quote_text, str) and quote_text.strip():
                         quote_text = quote_text.strip()
                         
-                        if compiled_mappings:
-                            for original, replacement, word_pattern, _, _ in compiled_mappings:
-                                if original.lower() in quote_text.lower():
-                                    if '@' in original:
-                                        quote_text = re.sub(re.escape(original), replacement, quote_text, flags=re.IGNORECASE)
-                                    else:
-                                        quote_text = word_pattern.sub(replacement, quote_text)
-                        elif name_mappings:
-                            sorted_mappings = sorted(name_mappings.items(), key=lambda x: len(x[0]), reverse=True)
-                            for original, replacement in sorted_mappings:
-                                if original.lower() in quote_text.lower():
-                                    word_pattern = r'\b' + re.escape(original) + r'\b'
-                                    quote_text = re.sub(word_pattern, replacement, quote_text, flags=re.IGNORECASE)
+                        if mapping_union is not None:
+                            quote_text = replace_mappings(quote_text, mapping_union)
                         
                         if len(quote_text) > 100:
                             quote_text = quote_text[:100] + "..."
@@ -164,17 +338,11 @@ def parse_chat_message(message, name_mappings=None, compiled_mappings=None):
         except Exception:
             pass
 
-        return {
-            'name': sender_name,
-            'timestamp': timestamp,
-            'full_text': f"{quote_md}{text}{attachment_md}{reactions_md}",
-            'original_name': original_name,
-            'email': creator_email
-        }
+        return f"{quote_md}{text}{attachment_md}{reactions_md}"
 
-    except Exception as e:
-        print(f"Error parsing message: {e}")
-        return None
+    except Exception:
+        logger.exception("Error rendering message")
+        return ""
 
 
 # ===== INITIALIZATION & SETTINGS =====
@@ -189,6 +357,25 @@ def initialize_streamlit_config() -> None:
     )
 
 
+def snapshot_settings() -> SimpleNamespace:
+    """
+    Read all user-configurable settings from session state in one go.
+    
+    Returns:
+        SimpleNamespace: Settings as plain attributes (defaults filled in)
+    """
+    state = st.session_state
+    return SimpleNamespace(
+        max_file_size_mb=state.get('max_file_size_mb', DEFAULT_MAX_FILE_SIZE_MB),
+        supported_file_types=state.get('supported_file_types', DEFAULT_SUPPORTED_FILE_TYPES),
+        supported_extensions=state.get('supported_extensions', DEFAULT_SUPPORTED_EXTENSIONS),
+        target_filename=state.get('target_filename', DEFAULT_TARGET_FILENAME),
+        messages_per_page=state.get('messages_per_page', DEFAULT_MESSAGES_PER_PAGE),
+        max_preview_length=state.get('max_preview_length', DEFAULT_MAX_PREVIEW_LENGTH),
+        email_domain=state.get('email_domain', DEFAULT_EMAIL_DOMAIN)
+    )
+
+
 def initialize_app_settings():
     """
     Initialize application settings in Streamlit session state.
@@ -200,6 +387,7 @@ def initialize_app_settings():
         # File handling settings
         st.session_state['max_file_size_mb'] = DEFAULT_MAX_FILE_SIZE_MB
         st.session_state['supported_file_types'] = DEFAULT_SUPPORTED_FILE_TYPES
+        st.session_state['supported_extensions'] = DEFAULT_SUPPORTED_EXTENSIONS
         st.session_state['target_filename'] = DEFAULT_TARGET_FILENAME
         
         # Display settings
@@ -221,55 +409,67 @@ def render_settings_panel():
     - Display preferences
     - Anonymization settings
     """
+    settings = snapshot_settings()
+    
     with st.sidebar:
         st.header("⚙️ Settings")
         
-        with st.expander("📁 File Settings", expanded=False):
-            st.session_state['max_file_size_mb'] = st.number_input(
-                "Max file size (MB)",
-                min_value=1,
-                max_value=500,
-                value=st.session_state.get('max_file_size_mb', DEFAULT_MAX_FILE_SIZE_MB),
-                help="Maximum allowed file size for uploads"
-            )
+        # One form: editing several settings costs a single rerun, on Apply
+        with st.form("settings_form"):
+            with st.expander("📁 File Settings", expanded=False):
+                max_file_size_mb = st.number_input(
+                    "Max file size (MB)",
+                    min_value=1,
+                    max_value=500,
+                    value=settings.max_file_size_mb,
+                    help="Maximum allowed file size for uploads"
+                )
+                
+                target_filename = st.text_input(
+                    "Target filename",
+                    value=settings.target_filename,
+                    help="Primary filename to look for (from Google Takeout)"
+                )
             
-            st.session_state['target_filename'] = st.text_input(
-                "Target filename",
-                value=st.session_state.get('target_filename', DEFAULT_TARGET_FILENAME),
-                help="Primary filename to look for (from Google Takeout)"
-            )
-        
-        with st.expander("🖥️ Display Settings", expanded=False):
-            st.session_state['messages_per_page'] = st.number_input(
-                "Messages per page",
-                min_value=10,
-                max_value=500,
-                value=st.session_state.get('messages_per_page', DEFAULT_MESSAGES_PER_PAGE),
-                step=10,
-                help="Number of messages to display per page"
-            )
+            with st.expander("🖥️ Display Settings", expanded=False):
+                messages_per_page = st.number_input(
+                    "Messages per page",
+                    min_value=10,
+                    max_value=500,
+                    value=settings.messages_per_page,
+                    step=10,
+                    help="Number of messages to display per page"
+                )
+                
+                max_preview_length = st.number_input(
+                    "Max preview length",
+                    min_value=50,
+                    max_value=500,
+                    value=settings.max_preview_length,
+                    step=10,
+                    help="Maximum characters for message preview"
+                )
             
-            st.session_state['max_preview_length'] = st.number_input(
-                "Max preview length",
-                min_value=50,
-                max_value=500,
-                value=st.session_state.get('max_preview_length', DEFAULT_MAX_PREVIEW_LENGTH),
-                step=10,
-                help="Maximum characters for message preview"
-            )
-        
-        with st.expander("🔒 Anonymization Settings", expanded=False):
-            st.session_state['email_domain'] = st.text_input(
-                "Anonymized email domain",
-                value=st.session_state.get('email_domain', DEFAULT_EMAIL_DOMAIN),
-                help="Domain to use for anonymized emails (e.g., example.com)"
-            )
+            with st.expander("🔒 Anonymization Settings", expanded=False):
+                email_domain = st.text_input(
+                    "Anonymized email domain",
+                    value=settings.email_domain,
+                    help="Domain to use for anonymized emails (e.g., example.com)"
+                )
+            
+            if st.form_submit_button("✅ Apply Settings", use_container_width=True):
+                st.session_state['max_file_size_mb'] = max_file_size_mb
+                st.session_state['target_filename'] = target_filename
+                st.session_state['messages_per_page'] = messages_per_page
+                st.session_state['max_preview_length'] = max_preview_length
+                st.session_state['email_domain'] = email_domain
         
         # Reset to defaults button
         st.divider()
         if st.button("🔄 Reset to Defaults", help="Reset all settings to default values"):
             st.session_state['max_file_size_mb'] = DEFAULT_MAX_FILE_SIZE_MB
             st.session_state['supported_file_types'] = DEFAULT_SUPPORTED_FILE_TYPES
+            st.session_state['supported_extensions'] = DEFAULT_SUPPORTED_EXTENSIONS
             st.session_state['target_filename'] = DEFAULT_TARGET_FILENAME
             st.session_state['messages_per_page'] = DEFAULT_MESSAGES_PER_PAGE
             st.session_state['max_preview_length'] = DEFAULT_MAX_PREVIEW_LENGTH
@@ -288,16 +488,27 @@ def select_json_file() -> Tuple[Optional[str], Optional[str]]:
     1. File upload widget for remote files
     2. Local file selection from current directory
     
+    Once a file is chosen it is kept in session state, and later reruns skip the
+    selection widgets until "Change file" is clicked.
+    
     Returns:
         Tuple[Optional[str], Optional[str]]: (file_path, display_name) or (None, None)
     """
-    from app import get_json_files
-    
     st.subheader("📁 Select Google Chat JSON File")
     
-    # Get settings
-    target_filename = st.session_state.get('target_filename', DEFAULT_TARGET_FILENAME)
-    supported_file_types = st.session_state.get('supported_file_types', DEFAULT_SUPPORTED_FILE_TYPES)
+    if st.session_state.get('active_file') is not None:
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            st.success(f"📄 Using **{st.session_state['active_name']}**")
+        with col2:
+            st.button("🔄 Change file", on_click=clear_active_file, use_container_width=True)
+        refresh_file_hash(st.session_state['active_file'])
+        return st.session_state['active_file'], st.session_state['active_name']
+    
+    # Get settings (read once and passed down to the upload/local handlers)
+    settings = snapshot_settings()
+    target_filename = settings.target_filename
+    supported_file_types = settings.supported_file_types
     
     # Informational guidance for users
     with st.container():
@@ -313,32 +524,75 @@ def select_json_file() -> Tuple[Optional[str], Optional[str]]:
     
     # Method 1: File Upload Widget
     st.write("**Option 1: Upload File**")
+    
+    # The uploader reads this cap when it is created, so the browser rejects
+    # oversized files before transferring them (the size check below stays as a backstop)
+    max_file_size_mb = settings.max_file_size_mb
+    try:
+        st._config.set_option("server.maxUploadSize", max_file_size_mb)
+    except Exception:
+        pass
+    
     uploaded_file = st.file_uploader(
-        f"Upload your Google Chat JSON file ({target_filename} recommended):",
+        f"Upload your Google Chat JSON file ({target_filename} recommended, max {max_file_size_mb}MB):",
         type=supported_file_types,
         help=f"Select the {target_filename} file from your Google Takeout export"
     )
     
     if uploaded_file is not None:
-        return handle_uploaded_file(uploaded_file)
+        selected_file, display_name = handle_uploaded_file(uploaded_file, settings)
+    else:
+        # Method 2: Local File Selection
+        selected_file, display_name = handle_local_file_selection(settings)
     
-    # Method 2: Local File Selection
-    return handle_local_file_selection()
+    if selected_file is not None:
+        st.session_state['active_file'] = selected_file
+        st.session_state['active_name'] = display_name
+        refresh_file_hash(selected_file)
+    
+    return selected_file, display_name
 
 
-def handle_uploaded_file(uploaded_file) -> Tuple[Optional[str], Optional[str]]:
+def refresh_file_hash(selected_file) -> None:
+    """
+    Keep st.session_state['file_hash'], the cache key for per-file work
+    (parsing, sorting, export), current for the selected file.
+    
+    Local paths are fingerprinted on every run - a single os.stat - so a file
+    changed on disk invalidates the caches. Uploads cannot change and hashing
+    their bytes is the expensive part, so they are fingerprinted once per selection.
+    """
+    if not isinstance(selected_file, str) and 'file_hash' in st.session_state:
+        return
+    try:
+        st.session_state['file_hash'] = file_fingerprint(selected_file)
+    except OSError:
+        st.session_state.pop('file_hash', None)
+
+
+def clear_active_file() -> None:
+    """on_click callback for "Change file": forget the chosen file so the selection UI shows again."""
+    st.session_state.pop('active_file', None)
+    st.session_state.pop('active_name', None)
+    st.session_state.pop('file_hash', None)
+    st.session_state.pop('message_window', None)
+
+
+def handle_uploaded_file(uploaded_file, settings: Optional[SimpleNamespace] = None) -> Tuple[Optional[str], Optional[str]]:
     """
     Process uploaded file with validation (no temp file created).
     
     Args:
         uploaded_file: Streamlit file upload object
+        settings: Snapshot from snapshot_settings() (read here if not given)
         
     Returns:
         Tuple[Optional[str], Optional[str]]: (uploaded_file, original_name) or (None, None)
     """
     # Get settings
-    max_file_size_mb = st.session_state.get('max_file_size_mb', DEFAULT_MAX_FILE_SIZE_MB)
-    supported_file_types = st.session_state.get('supported_file_types', DEFAULT_SUPPORTED_FILE_TYPES)
+    settings = settings or snapshot_settings()
+    max_file_size_mb = settings.max_file_size_mb
+    supported_file_types = settings.supported_file_types
     
     # File size validation
     max_size_bytes = max_file_size_mb * 1024 * 1024
@@ -348,7 +602,7 @@ def handle_uploaded_file(uploaded_file) -> Tuple[Optional[str], Optional[str]]:
     
     # File type validation
     file_extension = Path(uploaded_file.name).suffix.lower()
-    if file_extension not in [f".{ext}" for ext in supported_file_types]:
+    if file_extension not in settings.supported_extensions:
         st.error(f"⚠️ Unsupported file type! Supported: {', '.join(supported_file_types)}")
         return None, None
     
@@ -367,20 +621,32 @@ def handle_uploaded_file(uploaded_file) -> Tuple[Optional[str], Optional[str]]:
     return uploaded_file, uploaded_file.name
 
 
-def handle_local_file_selection() -> Tuple[Optional[str], Optional[str]]:
+@st.cache_data(ttl=10, show_spinner=False)
+def _cached_json_files(directory: str, target_filename: str) -> List[str]:
+    """
+    get_json_files() memoized for a few seconds, so reruns don't rescan the directory.
+    
+    directory and target_filename are part of the cache key only; the short TTL
+    lets newly added files show up.
+    """
+    return get_json_files()
+
+
+def handle_local_file_selection(settings: Optional[SimpleNamespace] = None) -> Tuple[Optional[str], Optional[str]]:
     """
     Handle local file selection from current directory.
     
+    Args:
+        settings: Snapshot from snapshot_settings() (read here if not given)
+    
     Returns:
         Tuple[Optional[str], Optional[str]]: (file_path, display_name) or (None, None)
     """
-    from app import get_json_files
-    
     # Get settings
-    target_filename = st.session_state.get('target_filename', DEFAULT_TARGET_FILENAME)
+    target_filename = (settings or snapshot_settings()).target_filename
     
-    # Discover local JSON files
-    json_files = get_json_files()
+    # Discover local JSON files (cached briefly across reruns)
+    json_files = _cached_json_files(os.getcwd(), target_filename)
     
     if not json_files:
         st.info("ℹ️ No JSON files found in current directory. Use file upload above.")
@@ -455,48 +721,48 @@ def anonymize_data_interface() -> Tuple[bool, Dict[str, str], Optional[str], Opt
     return True, custom_mappings, save_option, mode
 
 
+# Static feature cards, pre-joined so each column is a single element
+ANONYMIZATION_FEATURES_LEFT = """
+**👥 Names & Identity**
+• Names → Person 1, Person 2...
+• Custom replacements supported
+• Creator fields & message content
+• Company/organization names
+
+**🔗 Links & URLs**
+• All web links anonymized
+• Service context preserved
+• Google Drive/Workspace
+• GitHub, Slack, Zoom, etc.
+• Generic HTTP/HTTPS URLs
+"""
+
+ANONYMIZATION_FEATURES_RIGHT = """
+**📧 Contact Information**  
+• Emails → person1@example.com...
+• Auto-detection via regex
+• Full privacy protection
+• Domain anonymization
+
+**📁 File & Network Paths**
+• File paths anonymized
+• Network shares protected
+• IP addresses masked
+• Attachment filenames
+• Complete privacy coverage
+"""
+
+
 def display_anonymization_features() -> None:
-    """Display overview of anonymization features and capabilities."""
-    st.subheader("⚙️ Comprehensive Anonymization Features")
-    
-    with st.container():
+    """Display overview of anonymization features and capabilities (collapsed by default)."""
+    with st.expander("⚙️ Comprehensive Anonymization Features", expanded=False):
         col1, col2 = st.columns(2)
         
         with col1:
-            st.info("""
-            **👥 Names & Identity**
-            • Names → Person 1, Person 2...
-            • Custom replacements supported
-            • Creator fields & message content
-            • Company/organization names
-            """)
-            
-            st.info("""
-            **🔗 Links & URLs**
-            • All web links anonymized
-            • Service context preserved
-            • Google Drive/Workspace
-            • GitHub, Slack, Zoom, etc.
-            • Generic HTTP/HTTPS URLs
-            """)
+            st.info(ANONYMIZATION_FEATURES_LEFT)
         
         with col2:
-            st.info("""
-            **📧 Contact Information**  
-            • Emails → person1@example.com...
-            • Auto-detection via regex
-            • Full privacy protection
-            • Domain anonymization
-            """)
-            
-            st.info("""
-            **📁 File & Network Paths**
-            • File paths anonymized
-            • Network shares protected
-            • IP addresses masked
-            • Attachment filenames
-            • Complete privacy coverage
-            """)
+            st.info(ANONYMIZATION_FEATURES_RIGHT)
 
 
 def render_mode_selection() -> str:
@@ -547,6 +813,14 @@ def render_mode_selection() -> str:
     st.session_state['link_anonymization'] = link_anonymization
     st.session_state['link_level'] = "domain" if "Domain-aware" in link_level else "full"
     
+    case_insensitive_filenames = st.checkbox(
+        "📎 Match attachment names case-insensitively",
+        value=True,
+        help="Off: only replace names in attachment file names where the case matches exactly (faster on large exports)",
+        key="case_insensitive_filenames_enabled"
+    )
+    st.session_state['case_insensitive_filenames'] = case_insensitive_filenames
+    
     return "manual"  # Only manual mode supported
 
 
@@ -628,26 +902,90 @@ def show_custom_mapping_interface() -> None:
 
 
 def initialize_mapping_session_state() -> None:
-    """Initialize session state for custom mappings."""
+    """Initialize session state for custom mappings and their duplicate counts."""
     if 'custom_mappings' not in st.session_state:
         st.session_state.custom_mappings = []
+    
+    # Counts are kept up to date by add/remove/clear_custom_mapping(s), so
+    # render_existing_mappings() doesn't rescan the list on every rerun
+    if 'mapping_orig_counts' not in st.session_state:
+        st.session_state['mapping_orig_counts'] = dict(Counter(m['original'] for m in st.session_state.custom_mappings))
+        st.session_state['mapping_rep_counts'] = dict(Counter(m['replacement'] for m in st.session_state.custom_mappings))
+        # Mappings created before ids existed get one now
+        for mapping in st.session_state.custom_mappings:
+            mapping.setdefault('id', uuid.uuid4().hex)
 
 
+def add_custom_mapping(original: str, replacement: str) -> None:
+    """Append a custom mapping and update the duplicate counts."""
+    initialize_mapping_session_state()
+    st.session_state.custom_mappings.append({
+        'original': original,
+        'replacement': replacement,
+        # Stable id for widget keys, so deleting one row doesn't re-key the rows after it
+        'id': uuid.uuid4().hex
+    })
+    orig_counts = st.session_state['mapping_orig_counts']
+    rep_counts = st.session_state['mapping_rep_counts']
+    orig_counts[original] = orig_counts.get(original, 0) + 1
+    rep_counts[replacement] = rep_counts.get(replacement, 0) + 1
+
+
+def remove_custom_mapping(mapping_id: str) -> None:
+    """Remove the custom mapping with the given id and update the duplicate counts."""
+    initialize_mapping_session_state()
+    mappings = st.session_state.custom_mappings
+    index = next((i for i, m in enumerate(mappings) if m.get('id') == mapping_id), None)
+    if index is None:
+        return
+    mapping = mappings.pop(index)
+    for counts, key in ((st.session_state['mapping_orig_counts'], mapping['original']),
+                        (st.session_state['mapping_rep_counts'], mapping['replacement'])):
+        if counts.get(key, 0) > 1:
+            counts[key] -= 1
+        else:
+            counts.pop(key, None)
+
+
+def remove_custom_mappings(mapping_ids: List[str]) -> None:
+    """Remove every custom mapping whose id is in mapping_ids in one pass and rebuild the duplicate counts."""
+    initialize_mapping_session_state()
+    removed = set(mapping_ids)
+    mappings = [m for m in st.session_state.custom_mappings if m.get('id') not in removed]
+    st.session_state.custom_mappings = mappings
+    st.session_state['mapping_orig_counts'] = dict(Counter(m['original'] for m in mappings))
+    st.session_state['mapping_rep_counts'] = dict(Counter(m['replacement'] for m in mappings))
+
+
+def clear_custom_mappings() -> None:
+    """Remove all custom mappings and reset the duplicate counts."""
+    st.session_state.custom_mappings = []
+    st.session_state['mapping_orig_counts'] = {}
+    st.session_state['mapping_rep_counts'] = {}
+
+
+@fragment
 def render_add_mapping_interface() -> None:
-    """Render the interface for adding new custom mappings."""
+    """
+    Render the interface for adding new custom mappings.
+    
+    Runs as a fragment: editing the inputs reruns only this section. The Add
+    button's handle_add_mapping() callback runs before the fragment re-renders,
+    and a successful add is followed by one full app rerun.
+    """
     st.write("**➕ Add New Text Replacement:**")
     
     col1, col2, col3 = st.columns([3, 3, 1])
     
     with col1:
-        original_text = st.text_input(
+        st.text_input(
             "Original text to replace:", 
             key="new_original",
             placeholder="e.g., John Smith, company@email.com"
         )
     
     with col2:
-        replacement_text = st.text_input(
+        st.text_input(
             "Replace with:", 
             key="new_replacement",
             placeholder="e.g., Manager, team@example.com"
@@ -655,43 +993,59 @@ def render_add_mapping_interface() -> None:
     
     with col3:
         st.write("")  # Spacing
-        if st.button("➕ Add", help="Add this mapping"):
-            handle_add_mapping(original_text, replacement_text)
+        st.button("➕ Add", help="Add this mapping", on_click=handle_add_mapping)
+    
+    # A callback inside a fragment only reruns the fragment; rerun the app so the mapping applies
+    if st.session_state.pop('mapping_added', False) and _st_fragment is not None:
+        st.rerun()
+    
+    feedback = st.session_state.pop('add_mapping_feedback', None)
+    if feedback:
+        level, message = feedback
+        getattr(st, level)(message)
 
 
-def handle_add_mapping(original: str, replacement: str) -> None:
-    """Handle adding a new mapping with validation."""
+def handle_add_mapping() -> None:
+    """
+    on_click callback for the Add button: validate and add the mapping from the inputs.
+    
+    Feedback is queued in session state for render_add_mapping_interface() to show.
+    """
+    original = st.session_state.get('new_original', '')
+    replacement = st.session_state.get('new_replacement', '')
+    
     if not original or not original.strip():
-        st.error("❌ Original text cannot be empty")
+        st.session_state['add_mapping_feedback'] = ('error', "❌ Original text cannot be empty")
         return
     
     if not replacement or not replacement.strip():
-        st.error("❌ Replacement text cannot be empty")
+        st.session_state['add_mapping_feedback'] = ('error', "❌ Replacement text cannot be empty")
         return
     
     original_clean = original.strip()
     replacement_clean = replacement.strip()
     
     # Check for duplicates
-    existing_originals = {m['original'] for m in st.session_state.custom_mappings}
-    
-    if original_clean in existing_originals:
-        st.warning("⚠️ This mapping already exists! Remove the existing one first.")
+    initialize_mapping_session_state()
+    if original_clean in st.session_state['mapping_orig_counts']:
+        st.session_state['add_mapping_feedback'] = ('warning', "⚠️ This mapping already exists! Remove the existing one first.")
         return
     
-    # Add new mapping
-    new_mapping = {
-        'original': original_clean,
-        'replacement': replacement_clean
-    }
-    
-    st.session_state.custom_mappings.append(new_mapping)
-    st.success(f"✅ Added mapping: `{original_clean}` → `{replacement_clean}`")
-    st.rerun()
+    # Add new mapping and clear the inputs (allowed inside a callback)
+    add_custom_mapping(original_clean, replacement_clean)
+    st.session_state['new_original'] = ""
+    st.session_state['new_replacement'] = ""
+    st.session_state['add_mapping_feedback'] = ('success', f"✅ Added mapping: `{original_clean}` → `{replacement_clean}`")
+    st.session_state['mapping_added'] = True
 
 
+@fragment
 def render_bulk_import_interface() -> None:
-    """Render the bulk import interface for custom mappings."""
+    """
+    Render the bulk import interface for custom mappings.
+    
+    Runs as a fragment; a successful import triggers the full rerun.
+    """
     with st.expander("📥 Bulk Import Mappings (Key-Value Pairs)", expanded=False):
         st.info("Paste multiple mappings (one per line). Supported separators: `->`, `:`, `,`, `=`")
         st.caption("Format: `Original Text -> Replacement Text`")
@@ -738,10 +1092,7 @@ def render_bulk_import_interface() -> None:
                         if orig.lower() in existing_originals:
                             duplicates += 1
                         else:
-                            st.session_state.custom_mappings.append({
-                                'original': orig,
-                                'replacement': repl
-                            })
+                            add_custom_mapping(orig, repl)
                             existing_originals.add(orig.lower())
                             count += 1
             
@@ -756,17 +1107,23 @@ def render_bulk_import_interface() -> None:
                 st.error("❌ No valid mappings found. Please check the format.")
 
 
+@fragment
 def render_existing_mappings() -> None:
-    """Render the list of existing custom mappings."""
+    """
+    Render the list of existing custom mappings.
+    
+    One editable table with a Delete checkbox column replaces a row of widgets
+    per mapping. Runs as a fragment, so ticking checkboxes reruns only this
+    section; removing mappings triggers the full rerun.
+    """
     if not st.session_state.custom_mappings:
         st.info("💡 No custom mappings added yet. Add some above to get started!")
         return
     
     st.write("**📋 Your Custom Mappings:**")
-    originals = [m['original'] for m in st.session_state.custom_mappings]
-    replacements = [m['replacement'] for m in st.session_state.custom_mappings]
-    duplicate_originals = {orig for orig, count in Counter(originals).items() if count > 1}
-    duplicate_replacements = {rep for rep, count in Counter(replacements).items() if count > 1}
+    initialize_mapping_session_state()
+    duplicate_originals = {orig for orig, count in st.session_state['mapping_orig_counts'].items() if count > 1}
+    duplicate_replacements = {rep for rep, count in st.session_state['mapping_rep_counts'].items() if count > 1}
 
     if duplicate_originals or duplicate_replacements:
         warning_lines = []
@@ -782,36 +1139,42 @@ def render_existing_mappings() -> None:
             "⚠️ Duplicate mappings detected. Please review to avoid conflicting replacements.\n" + "\n".join(warning_lines)
         )
     
-    for i, mapping in enumerate(st.session_state.custom_mappings):
-        col1, col2, col3 = st.columns([4, 4, 1])
-        is_duplicate_original = mapping['original'] in duplicate_originals
-        is_duplicate_replacement = mapping['replacement'] in duplicate_replacements
-        
-        with col1:
-            label = mapping['original']
-            if is_duplicate_original:
-                label += " ⚠️"
-            st.write(f"**{label}**")
-        
-        with col2:
-            label = mapping['replacement']
-            if is_duplicate_replacement:
-                label += " ⚠️"
-            st.write(f"→ *{label}*")
-        
-        with col3:
-            if st.button("🗑️", key=f"delete_mapping_{i}", help="Remove this mapping"):
-                st.session_state.custom_mappings.pop(i)
-                st.success("✅ Mapping removed")
-                st.rerun()
+    rows = [
+        {
+            'Delete': False,
+            'Original': mapping['original'] + (" ⚠️" if mapping['original'] in duplicate_originals else ""),
+            'Replacement': mapping['replacement'] + (" ⚠️" if mapping['replacement'] in duplicate_replacements else ""),
+            'id': mapping['id']
+        }
+        for mapping in st.session_state.custom_mappings
+    ]
+    # Versioned key: after a removal the editor starts fresh instead of
+    # re-applying stale checkbox edits to the shifted rows
+    edited_rows = st.data_editor(
+        rows,
+        key=f"mapping_editor_{st.session_state.get('mapping_editor_version', 0)}",
+        use_container_width=True,
+        hide_index=True,
+        column_order=['Delete', 'Original', 'Replacement'],
+        disabled=['Original', 'Replacement'],
+        column_config={'Delete': st.column_config.CheckboxColumn("🗑️", help="Select mappings to remove", width="small")}
+    )
+    selected_ids = [row['id'] for row in edited_rows if row['Delete']]
+    
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        if st.button(f"🗑️ Remove Selected ({len(selected_ids)})", disabled=not selected_ids, use_container_width=True):
+            remove_custom_mappings(selected_ids)
+            st.session_state['mapping_editor_version'] = st.session_state.get('mapping_editor_version', 0) + 1
+            st.success(f"✅ Removed {len(selected_ids)} mapping(s)")
+            st.rerun()
     
     # Bulk actions
     if len(st.session_state.custom_mappings) > 1:
-        st.write("")
-        col1, col2, col3 = st.columns([1, 1, 1])
         with col2:
-            if st.button("🗑️ Clear All Mappings"):
-                st.session_state.custom_mappings = []
+            if st.button("🗑️ Clear All Mappings", use_container_width=True):
+                clear_custom_mappings()
+                st.session_state['mapping_editor_version'] = st.session_state.get('mapping_editor_version', 0) + 1
                 st.success("✅ All mappings cleared")
                 st.rerun()
 
@@ -824,15 +1187,16 @@ def render_mapping_preview() -> None:
     st.write("**👀 Replacement Preview:**")
     st.caption("These replacements will be applied to chat messages:")
     
-    with st.container():
-        for mapping in st.session_state.custom_mappings:
-            col1, col2, col3 = st.columns([4, 1, 4])
-            with col1:
-                st.code(mapping['original'], language=None)
-            with col2:
-                st.write("→")
-            with col3:
-                st.code(mapping['replacement'], language=None)
+    # One table element instead of three widgets per mapping
+    st.dataframe(
+        [
+            {'Original': mapping['original'], '→': '→', 'Replacement': mapping['replacement']}
+            for mapping in st.session_state.custom_mappings
+        ],
+        use_container_width=True,
+        hide_index=True,
+        column_config={'→': st.column_config.TextColumn("", width="small")}
+    )
 
 
 def get_custom_mappings_from_session() -> Dict[str, str]:
@@ -852,6 +1216,58 @@ def get_custom_mappings_from_session() -> Dict[str, str]:
 
 # ===== STATISTICS DISPLAY UI =====
 
+@lru_cache(maxsize=256)
+def suggest_anonymized_identity(original_name: str, original_email: str) -> Tuple[str, str]:
+    """
+    Suggest a replacement (name, email) from a participant's initials.
+    
+    Returns:
+        Tuple[str, str]: e.g. ("JS", "js@email.com"); the email is empty when original_email is 'N/A'
+    """
+    name_tokens = [token for token in original_name.split() if token]
+    first_initial = name_tokens[0][0] if name_tokens else ""
+    last_initial = name_tokens[-1][0] if len(name_tokens) > 1 else ""
+    if first_initial and last_initial:
+        initials = (first_initial + last_initial).upper()
+        suggested_email_local = (first_initial + last_initial).lower()
+    elif first_initial:
+        initials = first_initial.upper()
+        suggested_email_local = first_initial.lower()
+    else:
+        initials = "ANON"
+        suggested_email_local = "anon"
+    suggested_email = f"{suggested_email_local}@email.com" if original_email != 'N/A' else ""
+    return initials, suggested_email
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _build_message_table(message_counts_items: Tuple[Tuple[str, int], ...], total: int,
+                         participant_info_items: Tuple[Tuple[str, Tuple[str, str]], ...]) -> 'pd.DataFrame':
+    """
+    Build the per-participant table (most active first), cached across reruns with unchanged stats.
+    
+    Returns:
+        pd.DataFrame: Participant, Email, Messages and Percentage columns
+    """
+    # Imported here so sessions that never reach statistics don't pay for pandas
+    import pandas as pd
+    
+    counts = pd.DataFrame(list(message_counts_items), columns=['Participant', 'Messages'])
+    # Email was resolved via the original name (if anonymized) when the stats were built
+    info = pd.DataFrame(
+        [(name, email) for name, (email, _) in participant_info_items],
+        columns=['Participant', 'Email']
+    )
+    
+    table = counts.merge(info, on='Participant', how='left')
+    table['Email'] = table['Email'].fillna('N/A')
+    table['Percentage'] = table['Messages'] / total * 100
+    
+    # Stable sort keeps first-seen order for ties, like Counter.most_common()
+    table = table.sort_values('Messages', ascending=False, kind='stable', ignore_index=True)
+    return table[['Participant', 'Email', 'Messages', 'Percentage']]
+
+
 def display_message_statistics(stats):
     """Display comprehensive message statistics in the UI."""
     if not stats:
@@ -879,39 +1295,35 @@ def display_message_statistics(stats):
     # Detailed message counts
     st.subheader("👤 Messages per Participant")
     
-    # Get name to email mapping (uses original names)
-    name_to_email = stats.get('name_to_email', {})
-    # Get displayed name to original name mapping
-    display_to_original = stats.get('display_to_original', {})
+    # Immutable snapshots keep hashing cheap for the cached table build
+    message_table = _build_message_table(
+        tuple(stats['message_counts'].items()),
+        stats['total_messages'],
+        # Displayed name -> (email, original name)
+        tuple(stats.get('participant_info', {}).items())
+    )
     
-    message_data = []
-    for name, count in stats['message_counts'].most_common():
-        percentage = (count / stats['total_messages']) * 100
-        
-        # Get the original name (if anonymized) to lookup email
-        original_name = display_to_original.get(name, name)
-        email = name_to_email.get(original_name, 'N/A')
-        
-        message_data.append({
-            'Participant': name,
-            'Email': email,
-            'Messages': f"{count:,}",
-            'Percentage': f"{percentage:.1f}%"
-        })
+    # Rows for the Quick Anonymization participant picker below
+    message_data = message_table[['Participant', 'Email']].to_dict('records')
     
     if message_data:
         st.write("**Message Distribution:**")
         
-        for i, row in enumerate(message_data, 1):
-            col1, col2, col3, col4 = st.columns([3, 3, 2, 2])
-            with col1:
-                st.write(f"**{i}.** {row['Participant']}")
-            with col2:
-                st.write(f"📧 {row['Email']}")
-            with col3:
-                st.write(f"📬 {row['Messages']}")
-            with col4:
-                st.write(f"📊 {row['Percentage']}")
+        # One table element instead of four widgets per participant
+        st.dataframe(
+            message_table.assign(**{'#': range(1, len(message_table) + 1)})[
+                ['#', 'Participant', 'Email', 'Messages', 'Percentage']
+            ],
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                '#': st.column_config.NumberColumn(format="%d", width="small"),
+                'Participant': st.column_config.TextColumn("👤 Participant"),
+                'Email': st.column_config.TextColumn("📧 Email"),
+                'Messages': st.column_config.NumberColumn("📬 Messages", format="%d"),
+                'Percentage': st.column_config.NumberColumn("📊 Percentage", format="%.1f%%")
+            }
+        )
     
     # Most active day
     if stats['most_active_day']:
@@ -929,43 +1341,26 @@ def display_message_statistics(stats):
     with st.expander("✏️ Add Anonymization Mappings from Participants", expanded=False):
         st.info("💡 Select a participant from the list above and specify what to replace their name and email with")
         
-        # Get list of participants for selection
-        participant_names = [item['Participant'] for item in message_data]
-        participant_emails = [item['Email'] for item in message_data]
-        
-        # Create selection options with both name and email
-        participant_options = ["Select a participant..."] + [
-            f"{name} ({email})" for name, email in zip(participant_names, participant_emails)
-        ]
+        # (name, email) pairs are the options themselves, so nothing is parsed back out of labels
+        participant_pairs = [(item['Participant'], item['Email']) for item in message_data]
+        # The key changes with the participant list (new file or renamed senders),
+        # so a stored selection never carries over to a different list
+        participants_digest = hashlib.blake2b(repr(participant_pairs).encode('utf-8'), digest_size=8).hexdigest()
         
         col1, col2 = st.columns([3, 3])
         
         with col1:
             selected_participant = st.selectbox(
                 "Select participant to anonymize:",
-                participant_options,
-                key="quick_anon_participant"
+                [None] + participant_pairs,
+                format_func=lambda pair: "Select a participant..." if pair is None else f"{pair[0]} ({pair[1]})",
+                key=f"quick_anon_participant_{participants_digest}"
             )
         
         # Show input fields only if a participant is selected
-        if selected_participant != "Select a participant...":
-            # Extract the name and email from "Name (email)" format
-            original_name = selected_participant.split(" (")[0]
-            original_email = selected_participant.split(" (")[1].rstrip(")")
-            name_tokens = [token for token in original_name.split() if token]
-            first_initial = name_tokens[0][0] if name_tokens else ""
-            last_initial = name_tokens[-1][0] if len(name_tokens) > 1 else ""
-            if first_initial and last_initial:
-                initials = (first_initial + last_initial).upper()
-                suggested_email_local = (first_initial + last_initial).lower()
-            elif first_initial:
-                initials = first_initial.upper()
-                suggested_email_local = first_initial.lower()
-            else:
-                initials = "ANON"
-                suggested_email_local = "anon"
-            suggested_name = initials
-            suggested_email = f"{suggested_email_local}@email.com" if original_email != 'N/A' else ""
+        if selected_participant is not None:
+            original_name, original_email = selected_participant
+            suggested_name, suggested_email = suggest_anonymized_identity(original_name, original_email)
             
             # Reset defaults when participant selection changes
             last_selection = st.session_state.get('quick_anon_last_selection')
@@ -1010,22 +1405,12 @@ def display_message_statistics(stats):
             
             if add_button:
                 if replacement_name:
-                    # Initialize custom_mappings if not exists
-                    if 'custom_mappings' not in st.session_state:
-                        st.session_state.custom_mappings = []
-                    
                     # Add name mapping
-                    st.session_state.custom_mappings.append({
-                        'original': original_name,
-                        'replacement': replacement_name
-                    })
+                    add_custom_mapping(original_name, replacement_name)
                     
                     # Add email mapping if email is valid and replacement provided
                     if original_email != 'N/A' and replacement_email:
-                        st.session_state.custom_mappings.append({
-                            'original': original_email,
-                            'replacement': replacement_email
-                        })
+                        add_custom_mapping(original_email, replacement_email)
                     
                     st.success(f"✅ Added mapping: `{original_name}` → `{replacement_name}`")
                     if original_email != 'N/A' and replacement_email:
@@ -1039,15 +1424,16 @@ def display_message_statistics(stats):
         if 'custom_mappings' in st.session_state and st.session_state.custom_mappings:
             st.divider()
             st.write("**Current Mappings:**")
-            for idx, mapping in enumerate(st.session_state.custom_mappings):
+            initialize_mapping_session_state()
+            for mapping in st.session_state.custom_mappings:
                 col1, col2, col3 = st.columns([4, 4, 1])
                 with col1:
                     st.code(mapping['original'])
                 with col2:
                     st.code(mapping['replacement'])
                 with col3:
-                    if st.button("🗑️", key=f"quick_del_{idx}"):
-                        st.session_state.custom_mappings.pop(idx)
+                    if st.button("🗑️", key=f"quick_del_{mapping['id']}"):
+                        remove_custom_mapping(mapping['id'])
                         st.rerun()
     
     return message_data
@@ -1055,6 +1441,70 @@ def display_message_statistics(stats):
 
 # ===== MESSAGE DISPLAY UI =====
 
+def _extract_order_fields(messages: List[Any], name_mappings: Dict[str, str], offset: int = 0) -> List[Tuple[int, datetime]]:
+    """
+    Extract (index, timestamp) for every valid message.
+    
+    Also the process-pool worker for _parse_and_sort_messages(); offset is the
+    position of the chunk within the full message list.
+    """
+    extract = partial(extract_stats_fields, name_mappings=name_mappings)
+    return [
+        (i, parsed['timestamp'])
+        for i, parsed in enumerate(map(extract, messages), offset)
+        if parsed
+    ]
+
+
+def _parse_and_sort_messages(messages: List[Any], name_mappings: Dict[str, str]) -> 'array[int]':
+    """
+    Order the valid messages by timestamp.
+    
+    Returns the message indices in time order as a compact integer array rather
+    than a sorted copy of the messages, so a cached copy is cheap to restore on
+    each rerun; pages look up their messages by index. Very large chats are
+    split into one chunk per CPU and extracted in a process pool, falling back
+    to the in-process loop when worker processes cannot be started.
+    """
+    entries = None
+    workers = os.cpu_count() or 1
+    if workers > 1 and len(messages) >= PARALLEL_PARSE_MIN_MESSAGES:
+        chunk_size = -(-len(messages) // workers)
+        offsets = range(0, len(messages), chunk_size)
+        try:
+            with ProcessPoolExecutor(max_workers=len(offsets), mp_context=process_pool_context()) as executor:
+                results = executor.map(
+                    _extract_order_fields,
+                    [messages[i:i + chunk_size] for i in offsets],
+                    [name_mappings] * len(offsets),
+                    offsets
+                )
+                entries = [entry for chunk in results for entry in chunk]
+        except (OSError, BrokenProcessPool):
+            entries = None
+    
+    if entries is None:
+        entries = _extract_order_fields(messages, name_mappings)
+    entries.sort(key=lambda entry: entry[1])
+    return array('l', [index for index, _ in entries])
+
+
+def _hash_mappings(mappings: Dict[str, str]) -> str:
+    """Cache-key digest of a mapping dict: one C-level JSON dump instead of Streamlit's per-item hashing."""
+    return hashlib.blake2b(json.dumps(mappings, sort_keys=True).encode('utf-8'), digest_size=16).hexdigest()
+
+
+@st.cache_data(max_entries=4, show_spinner=False, hash_funcs={dict: _hash_mappings})
+def _parse_and_sort(messages_blob_hash: str, _raw_messages: List[Any], name_mappings: Dict[str, str]) -> 'array[int]':
+    """
+    _parse_and_sort_messages() memoized across reruns by file hash and mappings.
+    
+    The leading underscore keeps Streamlit from hashing the raw messages;
+    messages_blob_hash from file_fingerprint() identifies them instead.
+    """
+    return _parse_and_sort_messages(_raw_messages, name_mappings)
+
+
 def display_processed_messages(data: Dict[str, Any], name_mappings: Dict[str, str]) -> None:
     """
     Process and display chat messages with pagination.
@@ -1063,73 +1513,110 @@ def display_processed_messages(data: Dict[str, Any], name_mappings: Dict[str, st
         data: Chat data (original or anonymized)  
         name_mappings: Anonymization mappings applied
     """
-    
-    # Pre-compile mappings for display performance
-    compiled_mappings = compile_mappings(name_mappings) if name_mappings else None
-    
-    # Process messages with progress tracking
-    parsed_messages = []
-    progress_bar = st.progress(0)
-    total_messages = len(data.get('messages', []))
-    
-    if total_messages == 0:
+    messages = data.get('messages', [])
+    if not messages:
         st.warning("⚠️ No messages found in the data.")
         return
     
+    # Parsing and sorting is cached per file, so pagination clicks skip it entirely
+    file_hash = st.session_state.get('file_hash')
     with st.spinner("📝 Processing messages..."):
-        for i, msg in enumerate(data['messages']):
-            parsed_msg = parse_chat_message(msg, name_mappings, compiled_mappings)
-            if parsed_msg:
-                parsed_messages.append(parsed_msg)
-            
-            # Update progress every 100 messages
-            if i % 100 == 0:
-                progress_bar.progress((i + 1) / total_messages)
-    
-    progress_bar.progress(1.0)
+        if file_hash:
+            order = _parse_and_sort(file_hash, messages, name_mappings)
+        else:
+            order = _parse_and_sort_messages(messages, name_mappings)
     
-    if not parsed_messages:
+    if not order:
         st.warning("⚠️ No valid chat messages found.")
         return
 
-    # Sort messages by timestamp
-    sorted_messages = sorted(parsed_messages, key=lambda x: x['timestamp'])
-    
-    st.success(f"🎉 Successfully processed **{len(sorted_messages):,}** messages!")
+    st.success(f"🎉 Successfully processed **{len(order):,}** messages!")
     
     st.divider()
     
+    _render_page(messages, order, name_mappings)
+
+
+def reset_message_window() -> None:
+    """on_change callback for the page picker: start the new page at the first render window."""
+    st.session_state['message_window'] = MESSAGE_RENDER_WINDOW
+
+
+def extend_message_window() -> None:
+    """on_click callback for "Show more": render the next window of messages on this page."""
+    st.session_state['message_window'] = (
+        st.session_state.get('message_window', MESSAGE_RENDER_WINDOW) + MESSAGE_RENDER_WINDOW
+    )
+
+
+@fragment
+def _render_page(messages: List[Any], order: 'array[int]', name_mappings: Dict[str, str]) -> None:
+    """
+    Render the page picker and the messages on the current page.
+    
+    order holds message indices in time order; a page is a slice of it.
+    
+    Runs as a fragment, so changing the page reruns only this function
+    instead of the whole app. Only the first message_window messages of the
+    page are rendered; "Show more" extends the window in place.
+    """
+    # One union pattern scan per message instead of one pass per mapping
+    mapping_union = compile_mapping_union(name_mappings) if name_mappings else None
+    
     # Display messages with pagination
     st.subheader("💬 Chat Messages")
     
     messages_per_page = st.session_state.get('messages_per_page', DEFAULT_MESSAGES_PER_PAGE)
     
-    total_pages = (len(sorted_messages) - 1) // messages_per_page + 1
+    total_pages = (len(order) - 1) // messages_per_page + 1
     
     if total_pages > 1:
+        # Page lives in session state so it survives unrelated reruns;
+        # clamp it when the page count shrinks (new file or page size)
+        if st.session_state.get('message_page', 1) > total_pages:
+            st.session_state['message_page'] = total_pages
+        
         col1, col2, col3 = st.columns([1, 2, 1])
         with col2:
             page = st.number_input(
                 f"Page (1-{total_pages})", 
                 min_value=1, 
                 max_value=total_pages, 
-                value=1,
-                help=f"Showing {messages_per_page} messages per page"
+                help=f"Showing {messages_per_page} messages per page",
+                key="message_page",
+                on_change=reset_message_window
             )
         
         start_idx = (page - 1) * messages_per_page
-        end_idx = min(start_idx + messages_per_page, len(sorted_messages))
-        page_messages = sorted_messages[start_idx:end_idx]
+        end_idx = min(start_idx + messages_per_page, len(order))
+        page_indices = order[start_idx:end_idx]
         
-        st.info(f"Displaying messages {start_idx + 1}-{end_idx} of {len(sorted_messages)}")
+        st.info(f"Displaying messages {start_idx + 1}-{end_idx} of {len(order)}")
     else:
-        page_messages = sorted_messages
-    
-    # Display messages
-    for msg in page_messages:
-        with st.chat_message(name=msg['name']):
-            st.markdown(msg['full_text'], unsafe_allow_html=True)
-            st.caption(msg['timestamp'].strftime("%b %d, %Y at %I:%M %p"))
+        page_indices = order
+    
+    # Display messages (rendered lazily, only the visible window of the current page)
+    window = st.session_state.get('message_window', MESSAGE_RENDER_WINDOW)
+    for index in page_indices[:window]:
+        message = messages[index]
+        full_text = render_message(message, name_mappings, mapping_union=mapping_union)
+        if not full_text:
+            # Nothing to show (or rendering failed and was logged); skip the empty bubble
+            continue
+        # Sender and timestamp are re-read for the visible messages only
+        fields = extract_stats_fields(message, name_mappings)
+        with st.chat_message(name=fields['name']):
+            st.markdown(full_text, unsafe_allow_html=True)
+            st.caption(fields['timestamp'].strftime("%b %d, %Y at %I:%M %p"))
+    
+    remaining = len(page_indices) - window
+    if remaining > 0:
+        st.button(
+            f"⬇️ Show more ({remaining} left on this page)",
+            on_click=extend_message_window,
+            key="show_more_messages",
+            use_container_width=True
+        )
 
 
 # ===== APPLICATION HEADER UI =====
@@ -1231,18 +1718,18 @@ def load_and_validate_chat_data(file_path, display_name: str) -> Optional[Dict[s
     # Show file info
     if isinstance(file_path, str):
         st.info(f"📄 Loading: **{display_name}**")
-        st.caption(f"📁 Path: `{Path(file_path).absolute()}`")
+        # Resolved once per selected file rather than on every rerun
+        resolved = st.session_state.get('resolved_path')
+        if resolved is None or resolved[0] != file_path:
+            resolved = (file_path, str(Path(file_path).absolute()))
+            st.session_state['resolved_path'] = resolved
+        st.caption(f"📁 Path: `{resolved[1]}`")
     else:
         st.info(f"📄 Loading uploaded file: **{display_name}**")
     
     try:
         # Handle both file paths (strings) and file objects (from upload)
-        if isinstance(file_path, str):
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        else:
-            # File object from upload
-            data = json.load(file_path)
+        data = read_chat_json(file_path)
         
         # Validate data structure
         if not isinstance(data, dict):